@@ -17,58 +17,330 @@ This section of the code was adapted from the marker repository to load all the
 All credits for the original implementation go to VikParuchuri.
 """
 
+import os
+
+# Persist Inductor/Triton compile artifacts so restarts skip recompiling the
+# vision model. These must be set before torch is imported.
+_cache_root = os.path.expanduser("~/.cache/omniparse")
+os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", os.path.join(_cache_root, "inductor"))
+os.environ.setdefault("TRITON_CACHE_DIR", os.path.join(_cache_root, "triton"))
+# Let the caching allocator grow segments in place instead of fragmenting
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+
+import contextlib
+import numpy as np
 import torch
-from typing import Any
-from pydantic import BaseModel
+from unittest.mock import patch
 from transformers import AutoProcessor, AutoModelForCausalLM
-import whisper
+from transformers.dynamic_module_utils import get_imports
+from huggingface_hub import snapshot_download
+from faster_whisper import BatchedInferencePipeline, WhisperModel
 from omniparse.utils import print_omniparse_text_art
+from omniparse.batcher import MAX_BATCH_SIZE, VisionBatcher
+from omniparse.lazy import LazyModel, start_idle_reaper
 from omniparse.web.web_crawler import WebCrawler
 from marker.models import load_all_models
 # from omniparse.documents.models import load_all_models
 
+VISION_MODEL_ID = "microsoft/Florence-2-base"
+# Seconds a lazily loaded model may sit unused before it is unloaded
+IDLE_TTL = float(os.environ.get("OMNIPARSE_IDLE_TTL", 600))
+# Run dummy inputs through models at load time so the first request doesn't
+# pay for kernel selection and autotuning. Set to 0 to skip (e.g. in CI); this
+# also skips compiling the vision encoder, whose warmup is the slowest part.
+WARMUP = os.environ.get("OMNIPARSE_WARMUP", "1") == "1"
 
-class SharedState(BaseModel):
-    model_list: Any = None
-    vision_model: Any = None
-    vision_processor: Any = None
-    whisper_model: Any = None
-    crawler: Any = None
 
+def get_imports_without_flash_attn(filename):
+    # Florence-2's remote modeling code imports flash_attn unconditionally,
+    # which makes transformers refuse to load it when the wheel is missing
+    imports = get_imports(filename)
+    if "flash_attn" in imports:
+        imports.remove("flash_attn")
+    return imports
 
-shared_state = SharedState()
 
+def resolve_vision_checkpoint():
+    # Resolve Florence-2 to a local snapshot once, so the model/processor loads
+    # and attention fallbacks below read from disk instead of each revalidating
+    # against the Hub
+    try:
+        checkpoint_path = snapshot_download(VISION_MODEL_ID)
+    except OSError as e:
+        print(f"[LOG] ⚠️  Hub unreachable, using cached Vision Model: {str(e)}")
+        checkpoint_path = snapshot_download(VISION_MODEL_ID, local_files_only=True)
+    print(f"[LOG] ✅ Vision Model revision: {os.path.basename(checkpoint_path)}")
+    return checkpoint_path
+
+
+def load_vision_model(device, checkpoint_path):
+    # Prefer flash-attn, then PyTorch's built-in SDPA (which dispatches to fused
+    # flash / memory-efficient kernels on its own), then plain eager attention
+    last_error = None
+    for attn_implementation in ("flash_attention_2", "sdpa", "eager"):
+        if attn_implementation == "flash_attention_2":
+            import_check = contextlib.nullcontext()
+        else:
+            import_check = patch(
+                "transformers.dynamic_module_utils.get_imports",
+                get_imports_without_flash_attn,
+            )
+        try:
+            with import_check:
+                vision_model = AutoModelForCausalLM.from_pretrained(
+                    checkpoint_path,
+                    trust_remote_code=True,
+                    torch_dtype=get_vision_dtype(device),
+                    low_cpu_mem_usage=True,
+                    device_map={"": device},
+                    attn_implementation=attn_implementation,
+                )
+            print(f"[LOG] ✅ Vision Model attention backend: {attn_implementation}")
+            return vision_model
+        except (ImportError, ValueError, RuntimeError) as e:
+            print(f"[LOG] ⚠️  {attn_implementation} attention unavailable: {str(e)}")
+            last_error = e
+    raise last_error
+
+
+def get_vision_dtype(device):
+    # Half precision engages Tensor Cores and halves weight memory; bf16 is
+    # preferred on Ampere+ since it does not overflow in generation logits.
+    # is_bf16_supported() also reports emulated bf16 on older cards (T4, V100),
+    # which is far slower than their native fp16, so gate on compute capability.
+    if device.type != "cuda":
+        return torch.float32
+    if torch.cuda.get_device_capability(device)[0] >= 8:
+        return torch.bfloat16
+    return torch.float16
+
+
+def compile_vision_model(vision_model):
+    # Florence-2 always resizes inputs to 768x768, so the image encoder only
+    # sees the batcher's batch sizes and each can be captured as a CUDA graph.
+    # The text decoder grows its KV cache every step during generate(), so it
+    # is left in eager mode.
+    try:
+        import torch._dynamo.config as dynamo_config
+        import torch._inductor.config as inductor_config
+
+        print("[LOG] ✅ Compiling Vision Model")
+        torch.set_float32_matmul_precision("high")
+        inductor_config.triton.cudagraphs = True
+        inductor_config.fx_graph_cache = True
+        if hasattr(inductor_config, "autograd_cache"):
+            inductor_config.autograd_cache = True
+        # One compiled graph per batch size; make sure none get evicted
+        for limit in ("recompile_limit", "cache_size_limit"):
+            if hasattr(dynamo_config, limit):
+                setattr(
+                    dynamo_config,
+                    limit,
+                    max(getattr(dynamo_config, limit), MAX_BATCH_SIZE),
+                )
+        # Compilation is lazy; VisionBatcher warms up every batch size on its
+        # worker thread, where the CUDA graphs will be replayed
+        vision_model._encode_image = torch.compile(
+            vision_model._encode_image,
+            mode="reduce-overhead",
+            fullgraph=False,
+            dynamic=False,
+        )
+        return True
+    except Exception as e:
+        print(f"[LOG] ⚠️  Failed to compile Vision Model, using eager mode: {str(e)}")
+        vision_model.__dict__.pop("_encode_image", None)
+        return False
+
+
+def get_device():
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+
+def warmup_vision_model(vision_model, device):
+    print("[LOG] ✅ Warming up Vision Model")
+    pixel_values = torch.zeros(
+        1, 3, 768, 768, device=device, dtype=vision_model.dtype
+    )
+    input_ids = torch.tensor([[0]], device=device)
+    with torch.inference_mode():
+        # The second pass runs with kernels already selected / autotuned
+        for _ in range(2):
+            vision_model.generate(
+                input_ids=input_ids, pixel_values=pixel_values, max_new_tokens=4
+            )
+
+
+def warmup_whisper_model(whisper_model):
+    print("[LOG] ✅ Warming up Audio Model")
+    # Three seconds of silence; VAD is off so the encoder and decoder still run
+    audio = np.zeros(16000 * 3, dtype=np.float32)
+    for _ in range(2):
+        segments, _ = whisper_model.model.transcribe(audio, vad_filter=False)
+        list(segments)
+
+
+def freeze_model(model):
+    # Inference only: no dropout, and no autograd bookkeeping on the weights
+    model.eval()
+    model.requires_grad_(False)
+    return model
+
+
+def load_document_models():
+    print("[LOG] ✅ Loading OCR Model")
+    model_list = load_all_models()
+    for model in model_list:
+        if isinstance(model, torch.nn.Module):
+            freeze_model(model)
+    return model_list
+
+
+def load_vision_models():
+    device = get_device()
+    print("[LOG] ✅ Loading Vision Model")
+    # Try to load vision model (Florence-2), skip if no attention backend works
+    try:
+        checkpoint_path = resolve_vision_checkpoint()
+        vision_model = freeze_model(load_vision_model(device, checkpoint_path))
+        if WARMUP:
+            # Runs before compiling so no CUDA graphs are captured on this thread
+            warmup_vision_model(vision_model, device)
+        compiled = False
+        if device.type == "cuda" and WARMUP:
+            compiled = compile_vision_model(vision_model)
+        vision_processor = AutoProcessor.from_pretrained(
+            checkpoint_path, trust_remote_code=True
+        )
+        vision_batcher = VisionBatcher(
+            vision_model, vision_processor, compiled=compiled
+        )
+        vision_batcher.start()
+        print("[LOG] ✅ Vision Model loaded successfully")
+    except Exception as e:
+        print(f"[LOG] ⚠️  Failed to load Vision Model: {str(e)}")
+        print("[LOG] 📌 Vision model features will be disabled.")
+        return None
+
+    return {
+        "model": vision_model,
+        "processor": vision_processor,
+        "batcher": vision_batcher,
+    }
+
+
+def unload_vision_models(vision):
+    # The batcher thread holds the model, and its thread-local CUDA-graph pool,
+    # until it exits
+    vision["batcher"].stop()
+    # Dynamo caches the compiled encoder on Florence-2's shared code object, so
+    # it outlives the model (and on older torch keeps its weights alive). A
+    # reload then recompiles from scratch within the recompile limit.
+    torch.compiler.reset()
+
+
+def load_whisper_model():
+    device = get_device()
+    print("[LOG] ✅ Loading Audio Model")
+    if device.type == "cuda":
+        whisper_compute_type = "int8_float16"
+    else:
+        whisper_compute_type = "int8"
+    # The batched pipeline transcribes VAD-split chunks of a file in parallel
+    whisper_model = BatchedInferencePipeline(
+        model=WhisperModel(
+            "small",
+            device=device.type,
+            compute_type=whisper_compute_type,
+            num_workers=2,
+        )
+    )
+    if WARMUP:
+        warmup_whisper_model(whisper_model)
+    return whisper_model
+
+
+def load_crawler():
+    print("[LOG] ✅ Loading Web Crawler")
+    return WebCrawler(verbose=True)
+
+
+class SharedState:
+    """Models shared by all routers, each loaded on first use.
+
+    The attribute names match what the parsing code reads from ``model_state``;
+    ``models`` maps the CLI group names to their LazyModel slots.
+    """
+
+    def __init__(self):
+        self.models = {
+            "documents": LazyModel("OCR Model", load_document_models),
+            "vision": LazyModel(
+                "Vision Model", load_vision_models, on_unload=unload_vision_models
+            ),
+            "media": LazyModel("Audio Model", load_whisper_model),
+            "web": LazyModel(
+                "Web Crawler",
+                load_crawler,
+                # Dropping the reference would leave headless Chrome running
+                on_unload=lambda crawler: crawler.crawler_strategy.quit(),
+            ),
+        }
+
+    def use(self, name):
+        """Context manager that keeps the ``name`` model group loaded while held."""
+        return self.models[name].use()
+
+    def _vision(self, key):
+        vision = self.models["vision"].get()
+        return vision[key] if vision is not None else None
+
+    @property
+    def model_list(self):
+        return self.models["documents"].get()
+
+    @property
+    def vision_model(self):
+        return self._vision("model")
+
+    @property
+    def vision_processor(self):
+        return self._vision("processor")
+
+    @property
+    def vision_batcher(self):
+        return self._vision("batcher")
+
+    @property
+    def whisper_model(self):
+        return self.models["media"].get()
+
+    @property
+    def crawler(self):
+        return self.models["web"].get()
+
+    def __repr__(self):
+        loaded = [name for name, model in self.models.items() if model.loaded]
+        return f"SharedState(loaded={loaded})"
+
+
+shared_state = SharedState()
 
 def load_omnimodel(load_documents: bool, load_media: bool, load_web: bool):
-    global shared_state
     print_omniparse_text_art()
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    # Models requested on the command line are preloaded and pinned; anything
+    # else loads on its first request and is unloaded again once idle
     if load_documents:
-        print("[LOG] ✅ Loading OCR Model")
-        shared_state.model_list = load_all_models()
-        print("[LOG] ✅ Loading Vision Model")
-        # Try to load vision model (Florence-2), skip if flash-attn is not available
-        try:
-            shared_state.vision_model = AutoModelForCausalLM.from_pretrained(
-                "microsoft/Florence-2-base", trust_remote_code=True
-            ).to(device)
-            shared_state.vision_processor = AutoProcessor.from_pretrained(
-                "microsoft/Florence-2-base", trust_remote_code=True
-            )
-            print("[LOG] ✅ Vision Model loaded successfully")
-        except Exception as e:
-            print(f"[LOG] ⚠️  Failed to load Vision Model: {str(e)}")
-            print("[LOG] 📌 Vision model features will be disabled. Install flash-attn to enable vision model support.")
-            shared_state.vision_model = None
-            shared_state.vision_processor = None
+        shared_state.models["documents"].get(pin=True)
+        shared_state.models["vision"].get(pin=True)
 
     if load_media:
-        print("[LOG] ✅ Loading Audio Model")
-        shared_state.whisper_model = whisper.load_model("small")
+        shared_state.models["media"].get(pin=True)
 
     if load_web:
-        print("[LOG] ✅ Loading Web Crawler")
-        shared_state.crawler = WebCrawler(verbose=True)
+        shared_state.models["web"].get(pin=True)
+
+    start_idle_reaper(list(shared_state.models.values()), IDLE_TTL)
 
 
 def get_shared_state():
@@ -0,0 +1,205 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List
+
+import torch
+
+# Largest number of requests fused into one generate() call
+MAX_BATCH_SIZE = 8
+
+
+class PixelBuffers:
+    """Pinned host and device staging buffers reused across vision batches.
+
+    Copying through a page-locked host buffer lets the host-to-device transfer
+    run asynchronously, and reusing both buffers avoids an allocation per
+    request. Only safe to use from a single thread, such as the batcher worker.
+    """
+
+    def __init__(self, max_batch_size: int, device, dtype, image_size: int = 768):
+        shape = (max_batch_size, 3, image_size, image_size)
+        self.host = torch.empty(shape, dtype=dtype, pin_memory=True)
+        self.device = torch.empty(shape, dtype=dtype, device=device)
+
+    def fits(self, pixel_values) -> bool:
+        return (
+            pixel_values.shape[0] <= self.host.shape[0]
+            and pixel_values.shape[1:] == self.host.shape[1:]
+        )
+
+    def upload(self, pixel_values):
+        n = pixel_values.shape[0]
+        self.host[:n].copy_(pixel_values)
+        self.device[:n].copy_(self.host[:n], non_blocking=True)
+        return self.device[:n]
+
+
+def generate_batch(
+    task_prompt, images, vision_model, vision_processor, pixel_buffers=None
+) -> List[Dict[str, Any]]:
+    """Run Florence-2 once over a list of images that share the same task prompt."""
+    # Identical prompts tokenize to identical input_ids, so the batch needs no padding
+    inputs = vision_processor(
+        text=[task_prompt] * len(images), images=images, return_tensors="pt"
+    )
+    with torch.inference_mode():
+        pixel_values = inputs["pixel_values"]
+        if pixel_buffers is not None and pixel_buffers.fits(pixel_values):
+            pixel_values = pixel_buffers.upload(pixel_values)
+        else:
+            pixel_values = pixel_values.to(vision_model.device, vision_model.dtype)
+        generated_ids = vision_model.generate(
+            input_ids=inputs["input_ids"].to(vision_model.device),
+            pixel_values=pixel_values,
+            max_new_tokens=1024,
+            early_stopping=False,
+            do_sample=False,
+            num_beams=3,
+        )
+    generated_texts = vision_processor.batch_decode(
+        generated_ids, skip_special_tokens=False
+    )
+    # Shorter rows in a batch are right-padded, and post_process_generation
+    # leaves <pad> in place for the pure-text tasks
+    pad_token = vision_processor.tokenizer.pad_token
+    if pad_token:
+        generated_texts = [text.replace(pad_token, "") for text in generated_texts]
+    return [
+        vision_processor.post_process_generation(
+            generated_text, task=task_prompt, image_size=(image.width, image.height)
+        )
+        for generated_text, image in zip(generated_texts, images)
+    ]
+
+
+class VisionBatcher:
+    """Fuses concurrent Florence-2 requests into a single generate() call.
+
+    Requests are queued from any thread via ``submit``. A background worker
+    waits up to ``max_wait`` seconds for up to ``max_batch_size`` requests,
+    groups them by task prompt and runs one forward pass per group.
+
+    With ``compiled`` set, the worker first runs the compiled image encoder at
+    every batch size. Inductor's CUDA-graph trees are thread-local, so graphs
+    must be captured on the thread that replays them; ``start`` returns once
+    this warmup is done.
+    """
+
+    def __init__(
+        self,
+        vision_model,
+        vision_processor,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait: float = 0.015,
+        compiled: bool = False,
+    ):
+        self.vision_model = vision_model
+        self.vision_processor = vision_processor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.compiled = compiled
+        self._pixel_buffers = None
+        if vision_model.device.type == "cuda":
+            self._pixel_buffers = PixelBuffers(
+                max_batch_size, vision_model.device, vision_model.dtype
+            )
+        self._queue = queue.Queue()
+        self._stopped = False
+        self._stop_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="omniparse-vision-batcher", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self):
+        """Let the worker finish queued requests, then wait for it to exit.
+
+        Later ``submit`` calls raise instead of queueing behind the stop
+        sentinel, where their futures would never resolve. Once this returns
+        the worker no longer references the model or its staging buffers.
+        """
+        with self._stop_lock:
+            self._stopped = True
+            self._queue.put(None)
+        if self._thread.is_alive():
+            self._thread.join()
+        self._pixel_buffers = None
+
+    def submit(self, image, task_prompt) -> Future:
+        future = Future()
+        with self._stop_lock:
+            if self._stopped:
+                raise RuntimeError("Vision model was unloaded, retry the request")
+            self._queue.put((image, task_prompt, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size and batch[-1] is not None:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _warmup_encoder(self):
+        model = self.vision_model
+        try:
+            with torch.inference_mode():
+                for batch_size in range(1, self.max_batch_size + 1):
+                    dummy_pixels = torch.zeros(
+                        batch_size, 3, 768, 768, device=model.device, dtype=model.dtype
+                    )
+                    # The first call compiles, the second records the CUDA graph
+                    for _ in range(2):
+                        model._encode_image(dummy_pixels)
+        except Exception as e:
+            print(
+                f"[LOG] ⚠️  Failed to compile Vision Model, using eager mode: {str(e)}"
+            )
+            model.__dict__.pop("_encode_image", None)
+
+    def _run(self):
+        try:
+            if self.compiled:
+                self._warmup_encoder()
+        finally:
+            self._ready.set()
+
+        stopping = False
+        while not stopping:
+            batch = self._collect()
+            if batch[-1] is None:
+                # Stop sentinel: serve what was collected before it, then exit
+                batch.pop()
+                stopping = True
+            by_task = {}
+            for request in batch:
+                by_task.setdefault(request[1], []).append(request)
+
+            for task_prompt, requests in by_task.items():
+                images = [image for image, _, _ in requests]
+                try:
+                    results = generate_batch(
+                        task_prompt,
+                        images,
+                        self.vision_model,
+                        self.vision_processor,
+                        self._pixel_buffers,
+                    )
+                except Exception as e:
+                    for _, _, future in requests:
+                        future.set_exception(e)
+                else:
+                    for (_, _, future), result in zip(requests, results):
+                        future.set_result(result)
@@ -49,9 +49,8 @@ def parse_pdf(input_data, model_state) -> responseDocument:
                 "Invalid input data format. Expected bytes or PDF file path."
             )
 
-        full_text, images, out_meta = convert_single_pdf(
-            input_path, model_state.model_list
-        )
+        with model_state.use("documents") as model_list:
+            full_text, images, out_meta = convert_single_pdf(input_path, model_list)
 
         parse_pdf_result = responseDocument(text=full_text, metadata=out_meta)
         encode_images(images, parse_pdf_result)
@@ -105,9 +104,8 @@ def parse_ppt(input_data, model_state) -> responseDocument:
             )
             input_path = output_pdf_path
 
-        full_text, images, out_meta = convert_single_pdf(
-            input_path, model_state.model_list
-        )
+        with model_state.use("documents") as model_list:
+            full_text, images, out_meta = convert_single_pdf(input_path, model_list)
         images = encode_images(images)
 
         parse_ppt_result = responseDocument(text=full_text, metadata=out_meta)
@@ -160,9 +158,8 @@ def parse_doc(input_data, model_state) -> responseDocument:
             )
             input_path = output_pdf_path
 
-        full_text, images, out_meta = convert_single_pdf(
-            input_path, model_state.model_list
-        )
+        with model_state.use("documents") as model_list:
+            full_text, images, out_meta = convert_single_pdf(input_path, model_list)
         images = encode_images(images)
 
         parse_doc_result = responseDocument(text=full_text, metadata=out_meta)
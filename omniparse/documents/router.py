@@ -23,6 +23,7 @@ import subprocess
 
 # from omniparse.documents.parse import parse_single_pdf
 from fastapi import APIRouter, File, UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from omniparse import get_shared_state
 
@@ -36,13 +37,20 @@ document_router = APIRouter()
 model_state = get_shared_state()
 
 
+def convert_document(pdf_input):
+    # Called through run_in_threadpool: a cold request loads the OCR models
+    # here, and holding them keeps the idle reaper from unloading them mid-document
+    with model_state.use("documents") as model_list:
+        return convert_single_pdf(pdf_input, model_list)
+
+
 # Document parsing endpoints
 @document_router.post("/pdf")
 async def parse_pdf_endpoint(file: UploadFile = File(...)):
     try:
         file_bytes = await file.read()
-        full_text, images, out_meta = convert_single_pdf(
-            file_bytes, model_state.model_list
+        full_text, images, out_meta = await run_in_threadpool(
+            convert_document, file_bytes
         )
 
         result = responseDocument(text=full_text, metadata=out_meta)
@@ -82,7 +90,9 @@ async def parse_ppt_endpoint(file: UploadFile = File(...)):
     with open(output_pdf_path, "rb") as pdf_file:
         pdf_bytes = pdf_file.read()
 
-    full_text, images, out_meta = convert_single_pdf(pdf_bytes, model_state.model_list)
+    full_text, images, out_meta = await run_in_threadpool(
+        convert_document, pdf_bytes
+    )
 
     os.remove(input_path)
     os.remove(output_pdf_path)
@@ -120,7 +130,9 @@ async def parse_doc_endpoint(file: UploadFile = File(...)):
     with open(output_pdf_path, "rb") as pdf_file:
         pdf_bytes = pdf_file.read()
 
-    full_text, images, out_meta = convert_single_pdf(pdf_bytes, model_state.model_list)
+    full_text, images, out_meta = await run_in_threadpool(
+        convert_document, pdf_bytes
+    )
 
     result = responseDocument(text=full_text, metadata=out_meta)
     encode_images(images, result)
@@ -164,7 +176,9 @@ async def parse_any_endpoint(file: UploadFile = File(...)):
         input_path = output_pdf_path
 
     # Common parsing logic
-    full_text, images, out_meta = convert_single_pdf(input_path, model_state.model_list)
+    full_text, images, out_meta = await run_in_threadpool(
+        convert_document, input_path
+    )
 
     os.remove(input_path)
 
@@ -88,9 +88,10 @@ def parse_image(input_data, model_state) -> dict:
                 temp_files.append(temp_pdf_path)
 
         # Parse the PDF file
-        full_text, images, out_meta = convert_single_pdf(
-            temp_pdf_path, model_state.model_list
-        )
+        with model_state.use("documents") as model_list:
+            full_text, images, out_meta = convert_single_pdf(
+                temp_pdf_path, model_list
+            )
 
         parse_image_result = responseDocument(text=full_text, metadata=out_meta)
         encode_images(images, parse_image_result)
@@ -105,37 +106,20 @@ def parse_image(input_data, model_state) -> dict:
 
 
 def process_image(input_data, task, model_state) -> responseDocument:
-    try:
-        temp_files = []
-
-        if isinstance(input_data, bytes):
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                temp_file.write(input_data)
-                temp_file.flush()
-                temp_file_path = temp_file.name
-                temp_files.append(temp_file_path)
-
-        elif isinstance(input_data, str) and os.path.isfile(input_data):
-            temp_file_path = input_data
-            temp_files.append(temp_file_path)
-
-        else:
-            raise ValueError(
-                "Invalid input data format. Expected image bytes or image file path."
-            )
-
-        # Open the saved image using PIL
-        image_data = Image.open(temp_file_path).convert("RGB")
-
-        # Process the image using your function (e.g., process_image)
-        image_process_results: responseDocument = process_image_task(
-            image_data, task, model_state
+    # Decode straight from memory; Florence-2's processor and the drawing
+    # helpers both work on PIL images, so there is no temp file round trip
+    if isinstance(input_data, bytes):
+        image_data = Image.open(io.BytesIO(input_data)).convert("RGB")
+    elif isinstance(input_data, str) and os.path.isfile(input_data):
+        image_data = Image.open(input_data).convert("RGB")
+    else:
+        raise ValueError(
+            "Invalid input data format. Expected image bytes or image file path."
         )
 
-        return image_process_results
+    # Process the image using your function (e.g., process_image)
+    image_process_results: responseDocument = process_image_task(
+        image_data, task, model_state
+    )
 
-    finally:
-        # Clean up the temporary files
-        for file_path in temp_files:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+    return image_process_results
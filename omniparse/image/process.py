@@ -18,6 +18,7 @@ import base64
 from io import BytesIO
 import copy
 from omniparse.image.utils import plot_bbox, fig_to_pil, draw_polygons, draw_ocr_bboxes
+from omniparse.batcher import generate_batch
 from omniparse.models import responseDocument
 
 
@@ -78,12 +79,16 @@ def process_image_task(
     else:
         raise ValueError("Invalid task prompt")
 
-    results, processed_image = pre_process_image(
-        pil_image,
-        task_prompt_model,
-        model_state.vision_model,
-        model_state.vision_processor,
-    )
+    with model_state.use("vision") as vision:
+        if vision is None:
+            raise RuntimeError("Vision model failed to load")
+        results, processed_image = pre_process_image(
+            pil_image,
+            task_prompt_model,
+            vision["model"],
+            vision["processor"],
+            vision["batcher"],
+        )
     # Update responseDocument fields based on the results
     process_image_result = responseDocument(text=str(results))
 
@@ -94,69 +99,69 @@ def process_image_task(
 
 
 # Your pre_process_image function with some adjustments
-def pre_process_image(image, task_prompt, vision_model, vision_processor):
+def pre_process_image(image, task_prompt, vision_model, vision_processor, vision_batcher=None):
     if task_prompt == "<CAPTION>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         return results, None
     elif task_prompt == "<DETAILED_CAPTION>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         return results, None
     elif task_prompt == "<MORE_DETAILED_CAPTION>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         return results, None
     elif task_prompt == "<CAPTION_TO_PHRASE_GROUNDING>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         fig = plot_bbox(image, results[task_prompt])
         return results, fig_to_pil(fig)
     elif task_prompt == "<DETAILED_CAPTION + GROUNDING>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         fig = plot_bbox(image, results[task_prompt])
         return results, fig_to_pil(fig)
     elif task_prompt == "<MORE_DETAILED_CAPTION + GROUNDING>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         fig = plot_bbox(image, results[task_prompt])
         return results, fig_to_pil(fig)
     elif task_prompt == "<OD>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         fig = plot_bbox(image, results[task_prompt])
         return results, fig_to_pil(fig)
     elif task_prompt == "<DENSE_REGION_CAPTION>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         fig = plot_bbox(image, results[task_prompt])
         return results, fig_to_pil(fig)
     elif task_prompt == "<REGION_PROPOSAL>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         fig = plot_bbox(image, results[task_prompt])
         return results, fig_to_pil(fig)
     elif task_prompt == "<CAPTION_TO_PHRASE_GROUNDING>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         fig = plot_bbox(image, results[task_prompt])
         return results, fig_to_pil(fig)
     elif task_prompt == "<REFERRING_EXPRESSION_SEGMENTATION>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         output_image = copy.deepcopy(image)
         output_image = draw_polygons(output_image, results[task_prompt], fill_mask=True)
         return results, output_image
     elif task_prompt == "<REGION_TO_SEGMENTATION>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         output_image = copy.deepcopy(image)
         output_image = draw_polygons(output_image, results[task_prompt], fill_mask=True)
         return results, output_image
     elif task_prompt == "<OPEN_VOCABULARY_DETECTION>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         fig = plot_bbox(image, results[task_prompt])
         return results, fig_to_pil(fig)
     elif task_prompt == "<REGION_TO_CATEGORY>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         return results, None
     elif task_prompt == "<REGION_TO_DESCRIPTION>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         return results, None
     elif task_prompt == "<OCR>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         return results, None
     elif task_prompt == "<OCR_WITH_REGION>":
-        results = run_example(task_prompt, image, vision_model, vision_processor)
+        results = run_example(task_prompt, image, vision_model, vision_processor, vision_batcher)
         output_image = copy.deepcopy(image)
         output_image = draw_ocr_bboxes(output_image, results[task_prompt])
         return results, output_image
@@ -164,24 +169,9 @@ def pre_process_image(image, task_prompt, vision_model, vision_processor):
         raise ValueError("Invalid task prompt")
 
 
-def run_example(task_prompt, image, vision_model, vision_processor):
-    # if text_input is None:
-    prompt = task_prompt
-    # else:
-    #     prompt = task_prompt + text_input
-    inputs = vision_processor(text=prompt, images=image, return_tensors="pt").to("cuda")
-    generated_ids = vision_model.generate(
-        input_ids=inputs["input_ids"],
-        pixel_values=inputs["pixel_values"],
-        max_new_tokens=1024,
-        early_stopping=False,
-        do_sample=False,
-        num_beams=3,
-    )
-    generated_text = vision_processor.batch_decode(
-        generated_ids, skip_special_tokens=False
-    )[0]
-    parsed_answer = vision_processor.post_process_generation(
-        generated_text, task=task_prompt, image_size=(image.width, image.height)
-    )
-    return parsed_answer
+def run_example(task_prompt, image, vision_model, vision_processor, vision_batcher=None):
+    # Route through the shared batcher when running in the server so that
+    # concurrent requests are fused into one generate() call
+    if vision_batcher is not None:
+        return vision_batcher.submit(image, task_prompt).result()
+    return generate_batch(task_prompt, [image], vision_model, vision_processor)[0]
@@ -1,4 +1,5 @@
 from fastapi import UploadFile, File, HTTPException, APIRouter, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from omniparse import get_shared_state
 from omniparse.image import parse_image, process_image
@@ -12,7 +13,9 @@ model_state = get_shared_state()
 async def parse_image_endpoint(file: UploadFile = File(...)):
     try:
         file_bytes = await file.read()
-        result: responseDocument = parse_image(file_bytes, model_state)
+        result: responseDocument = await run_in_threadpool(
+            parse_image, file_bytes, model_state
+        )
         return JSONResponse(content=result.model_dump())
 
     except Exception as e:
@@ -23,7 +26,9 @@ async def parse_image_endpoint(file: UploadFile = File(...)):
 async def process_image_route(image: UploadFile = File(...), task: str = Form(...)):
     try:
         file_bytes = await image.read()
-        result: responseDocument = process_image(file_bytes, task, model_state)
+        result: responseDocument = await run_in_threadpool(
+            process_image, file_bytes, task, model_state
+        )
         return JSONResponse(content=result.model_dump())
 
     except Exception as e:
@@ -0,0 +1,102 @@
+import gc
+import threading
+from contextlib import contextmanager
+import time
+
+import torch
+
+
+class LazyModel:
+    """Loads a model on first access and can drop it again once it sits idle.
+
+    ``loader`` is called at most once per load, under a lock, so concurrent
+    first requests wait for a single load. Pinned models are never evicted by
+    the idle reaper, and no model is unloaded while a ``use()`` block holds it.
+    """
+
+    def __init__(self, name, loader, on_unload=None):
+        self.name = name
+        self.loader = loader
+        self.on_unload = on_unload
+        self.pinned = False
+        self.last_used = 0.0
+        self._value = None
+        self._loaded = False
+        self._users = 0
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def _load(self):
+        if not self._loaded:
+            self._value = self.loader()
+            self._loaded = True
+        return self._value
+
+    def get(self, pin: bool = False):
+        with self._lock:
+            self.pinned = self.pinned or pin
+            self.last_used = time.monotonic()
+            return self._load()
+
+    @contextmanager
+    def use(self):
+        """Hold the model loaded for the duration of a job.
+
+        The idle clock restarts when the block exits, so a long job is not
+        evicted halfway through and then reloaded by the next request.
+        """
+        with self._lock:
+            value = self._load()
+            self._users += 1
+        try:
+            yield value
+        finally:
+            with self._lock:
+                self._users -= 1
+                self.last_used = time.monotonic()
+
+    def unload(self, idle_ttl=None) -> bool:
+        """Drop the model and release its GPU memory.
+
+        With ``idle_ttl`` set, only unloads an unpinned model that has not been
+        used for that many seconds. A model that is in use is never unloaded.
+        Returns whether anything was unloaded.
+        """
+        with self._lock:
+            if not self._loaded or self._users:
+                return False
+            if idle_ttl is not None and (
+                self.pinned or time.monotonic() - self.last_used < idle_ttl
+            ):
+                return False
+            value = self._value
+            self._value = None
+            self._loaded = False
+            self.pinned = False
+
+        if self.on_unload is not None and value is not None:
+            self.on_unload(value)
+        del value
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+            torch.cuda.ipc_collect()
+        return True
+
+
+def start_idle_reaper(models, idle_ttl: float, interval: float = 60):
+    """Periodically unload models that have been idle for ``idle_ttl`` seconds."""
+
+    def reap():
+        while True:
+            time.sleep(interval)
+            for model in models:
+                if model.unload(idle_ttl=idle_ttl):
+                    print(f"[LOG] 💤 Unloaded idle {model.name}")
+
+    thread = threading.Thread(target=reap, name="omniparse-idle-reaper", daemon=True)
+    thread.start()
+    return thread
@@ -43,11 +43,12 @@ def parse_audio(input_data, model_state) -> responseDocument:
             )
 
         # Transcribe the audio file
-        transcript = transcribe(
-            audio_path=temp_audio_path,
-            whisper_model=model_state.whisper_model,
-            **WHISPER_DEFAULT_SETTINGS,
-        )
+        with model_state.use("media") as whisper_model:
+            transcript = transcribe(
+                audio_path=temp_audio_path,
+                whisper_model=whisper_model,
+                **WHISPER_DEFAULT_SETTINGS,
+            )
 
         return responseDocument(text=transcript["text"])
 
@@ -81,11 +82,12 @@ def parse_video(input_data, model_state) -> responseDocument:
         video_clip.close()
 
         # Transcribe the audio file
-        transcript = transcribe(
-            audio_path=audio_path,
-            whisper_model=model_state.whisper_model,
-            **WHISPER_DEFAULT_SETTINGS,
-        )
+        with model_state.use("media") as whisper_model:
+            transcript = transcribe(
+                audio_path=audio_path,
+                whisper_model=whisper_model,
+                **WHISPER_DEFAULT_SETTINGS,
+            )
 
         return responseDocument(text=transcript["text"])
 
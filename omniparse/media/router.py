@@ -18,6 +18,7 @@ All credits for the original implementation go to OpenAI.
 """
 
 from fastapi import FastAPI, UploadFile, File, HTTPException, APIRouter, status, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from omniparse.models import responseDocument
 from omniparse.media import parse_audio, parse_video
@@ -31,7 +32,9 @@ model_state = get_shared_state()
 async def parse_audio_endpoint(file: UploadFile = File(...)):
     try:
         file_bytes = await file.read()
-        result: responseDocument = parse_audio(file_bytes, model_state)
+        result: responseDocument = await run_in_threadpool(
+            parse_audio, file_bytes, model_state
+        )
         return JSONResponse(content=result.model_dump())
 
     except Exception as e:
@@ -42,7 +45,9 @@ async def parse_audio_endpoint(file: UploadFile = File(...)):
 async def parse_video_endpoint(file: UploadFile = File(...)):
     try:
         file_bytes = await file.read()
-        result: responseDocument = parse_video(file_bytes, model_state)
+        result: responseDocument = await run_in_threadpool(
+            parse_video, file_bytes, model_state
+        )
         return JSONResponse(content=result.model_dump())
 
     except Exception as e:
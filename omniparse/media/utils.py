@@ -40,12 +40,14 @@ def transcribe(audio_path: str, whisper_model, **whisper_args):
 
     del whisper_args["temperature_increment_on_fallback"]
 
-    transcript = whisper_model.transcribe(
+    segments, info = whisper_model.transcribe(
         audio_path,
         **whisper_args,
     )
+    # faster-whisper yields segments lazily; decoding happens while joining
+    text = "".join(segment.text for segment in segments).strip()
 
-    return transcript
+    return {"text": text, "language": info.language}
 
 
 # function for enabling CORS on web server
@@ -53,9 +55,11 @@ WHISPER_DEFAULT_SETTINGS = {
     "temperature": 0.0,
     "temperature_increment_on_fallback": 0.2,
     "no_speech_threshold": 0.6,
-    "logprob_threshold": -1.0,
+    "log_prob_threshold": -1.0,
     "compression_ratio_threshold": 2.4,
     "condition_on_previous_text": True,
-    "verbose": False,
     "task": "transcribe",
+    "beam_size": 5,
+    "vad_filter": True,
+    "batch_size": 8,
 }
@@ -18,6 +18,13 @@ from concurrent.futures import ThreadPoolExecutor
 from omniparse.models import responseDocument
 
 
+def crawl(model_state, *args):
+    # Runs on the executor thread, so a first request loads the crawler off
+    # the event loop, and holding it keeps the idle reaper from closing it mid-crawl
+    with model_state.use("web") as crawler:
+        return crawler.run(*args)
+
+
 async def parse_url(url: str, model_state) -> responseDocument:
     try:
         logging.debug("[LOG] Loading extraction and chunking strategies...")
@@ -36,7 +43,8 @@ async def parse_url(url: str, model_state) -> responseDocument:
             loop = asyncio.get_event_loop()
             future = loop.run_in_executor(
                 executor,
-                model_state.crawler.run,
+                crawl,
+                model_state,
                 str(url),
                 word_count_threshold,
                 bypass_cache,
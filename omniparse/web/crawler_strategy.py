@@ -60,6 +60,10 @@ class CrawlerStrategy(ABC):
     def update_user_agent(self, user_agent: str):
         pass
 
+    def quit(self):
+        """Release any browser or driver process held by the strategy."""
+        pass
+
 
 class LocalSeleniumCrawlerStrategy(CrawlerStrategy):
     def __init__(self, use_cached_html=False, js_code=None, **kwargs):
@@ -96,6 +100,9 @@ class LocalSeleniumCrawlerStrategy(CrawlerStrategy):
         self.service.log_path = "NUL"
         self.driver = webdriver.Chrome(service=self.service, options=self.options)
 
+    def quit(self):
+        self.driver.quit()
+
     def update_user_agent(self, user_agent: str):
         self.options.add_argument(f"user-agent={user_agent}")
         self.driver.quit()
@@ -1,9 +1,10 @@
 import warnings
 import argparse
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
-from omniparse import load_omnimodel
+from omniparse import load_omnimodel, get_shared_state
 from omniparse.documents.router import document_router
 from omniparse.media.router import media_router
 from omniparse.image.router import image_router
@@ -35,6 +36,20 @@ app.include_router(document_router, prefix="/parse_document", tags=["Documents"]
 app.include_router(image_router, prefix="/parse_image", tags=["Images"])
 app.include_router(media_router, prefix="/parse_media", tags=["Media"])
 app.include_router(website_router, prefix="/parse_website", tags=["Website"])
+
+
+@app.post("/admin/unload/{model}", tags=["Admin"])
+async def unload_model(model: str):
+    models = get_shared_state().models
+    if model not in models:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown model '{model}'. Expected one of: {', '.join(models)}",
+        )
+    unloaded = await run_in_threadpool(models[model].unload)
+    return {"model": model, "unloaded": unloaded}
+
+
 app = gr.mount_gradio_app(app, demo_ui, path="")
 
 
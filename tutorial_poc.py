@@ -10,43 +10,80 @@ Endpoints:
 - /parse_media - Parse audio/video files
 - /parse_website - Parse web pages
 
+Requires httpx with HTTP/2 support and orjson: pip install "httpx[http2]" orjson
+
 Usage:
     python tutorial_poc.py --host localhost --port 8000 --test all
 """
 
 import argparse
+import asyncio
 import base64
-import json
+import hashlib
+import mimetypes
 import os
 import sys
-import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+
+import httpx
+import orjson
 
-import requests
+# Number of parsed web pages kept by OmniParseAPIClient.parse_website
+WEBSITE_CACHE_SIZE = 1024
 
 
 class OmniParseAPIClient:
-    """Client for testing OmniParse API endpoints."""
+    """Async client for testing OmniParse API endpoints.
+
+    All requests share one pooled ``httpx.AsyncClient`` so connections are
+    reused across calls. Use it as an async context manager (or call
+    ``aclose``) to release the pool.
+    """
 
     def __init__(self, host: str = "localhost", port: int = 8000):
         self.base_url = f"http://{host}:{port}"
         self.host = host
         self.port = port
-
-    def test_health(self) -> Dict[str, Any]:
+        # Pool limits and HTTP/2 live on the transport once one is passed in;
+        # retries only cover connection failures, never a sent upload
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            http2=True,
+            retries=3,
+        )
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=600,
+            transport=transport,
+        )
+        self._website_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    async def __aenter__(self) -> "OmniParseAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self._client.aclose()
+
+    async def test_health(self) -> Dict[str, Any]:
         """Test the root endpoint to verify server is running."""
         try:
-            response = requests.get(f"{self.base_url}/", timeout=5)
+            response = await self._client.get("/", timeout=5)
             return {
                 "success": True,
                 "status_code": response.status_code,
-                "data": response.json() if response.text else {"message": "Server is running"},
+                "data": orjson.loads(response.content) if response.content else {"message": "Server is running"},
             }
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
+            # ValueError covers non-JSON replies, e.g. an HTML error page
             return {"success": False, "error": str(e)}
 
-    def parse_document(self, file_path: str) -> Dict[str, Any]:
+    async def parse_document(self, file_path: str) -> Dict[str, Any]:
         """Parse a document file (PDF, PPT, DOC, PPTX, DOCX).
 
         Args:
@@ -55,59 +92,98 @@ class OmniParseAPIClient:
         Returns:
             Response from the API containing parsed text and metadata
         """
-        if not os.path.exists(file_path):
-            return {"success": False, "error": f"File not found: {file_path}"}
+        return await self._parse_file_endpoint("/parse_document", file_path)
 
-        try:
-            with open(file_path, "rb") as f:
-                files = {"file": (os.path.basename(file_path), f, "application/pdf")}
-                response = requests.post(
-                    f"{self.base_url}/parse_document",
-                    files=files,
-                    timeout=300,
-                )
-                return {
-                    "success": True,
-                    "status_code": response.status_code,
-                    "data": response.json(),
-                }
-        except requests.exceptions.RequestException as e:
-            return {"success": False, "error": str(e)}
+    async def parse_documents_batch(self, file_paths: List[str]) -> List[Dict[str, Any]]:
+        """Parse several documents concurrently over the shared connection pool.
+
+        Args:
+            file_paths: Paths to the document files
+
+        Returns:
+            One response per file, in the same order as ``file_paths``
+        """
+        return await asyncio.gather(
+            *(self.parse_document(file_path) for file_path in file_paths)
+        )
 
-    def parse_document_pdf(self, file_path: str) -> Dict[str, Any]:
+    async def parse_document_pdf(self, file_path: str) -> Dict[str, Any]:
         """Parse a PDF document specifically."""
-        return self._parse_file_endpoint("/parse_document/pdf", file_path)
+        return await self._parse_file_endpoint("/parse_document/pdf", file_path)
 
-    def parse_document_ppt(self, file_path: str) -> Dict[str, Any]:
+    async def parse_document_ppt(self, file_path: str) -> Dict[str, Any]:
         """Parse a PPT document specifically."""
-        return self._parse_file_endpoint("/parse_document/ppt", file_path)
+        return await self._parse_file_endpoint("/parse_document/ppt", file_path)
 
-    def parse_document_docs(self, file_path: str) -> Dict[str, Any]:
+    async def parse_document_docs(self, file_path: str) -> Dict[str, Any]:
         """Parse a DOC document specifically."""
-        return self._parse_file_endpoint("/parse_document/docs", file_path)
+        return await self._parse_file_endpoint("/parse_document/docs", file_path)
+
+    @staticmethod
+    def _preflight(file_path: str) -> Dict[str, Any]:
+        """Validate a file before uploading it and compute its SHA-256.
 
-    def _parse_file_endpoint(self, endpoint: str, file_path: str) -> Dict[str, Any]:
-        """Helper to parse files via specific endpoints."""
-        if not os.path.exists(file_path):
+        Missing and empty files are rejected up front instead of after the
+        upload. The digest is sent as ``X-Content-SHA256`` so the server can
+        recognise repeated uploads.
+        """
+        try:
+            size = os.stat(file_path).st_size
+        except FileNotFoundError:
             return {"success": False, "error": f"File not found: {file_path}"}
+        if size == 0:
+            return {"success": False, "error": f"Empty file: {file_path}"}
+
+        with open(file_path, "rb") as f:
+            if hasattr(hashlib, "file_digest"):
+                # Python 3.11+: hashes in C, without a Python-level read loop
+                digest = hashlib.file_digest(f, "sha256")
+            else:
+                digest = hashlib.sha256()
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        return {"size": size, "sha256": digest.hexdigest()}
+
+    async def _parse_file_endpoint(
+        self,
+        endpoint: str,
+        file_path: str,
+        field: str = "file",
+        data: Optional[Dict[str, str]] = None,
+        timeout: float = 300,
+    ) -> Dict[str, Any]:
+        """Helper to parse files via specific endpoints.
 
+        The open file handle is passed straight to httpx, which streams the
+        multipart body from disk in 64 KiB chunks instead of reading the whole
+        file into memory first.
+        """
+        # Hashing reads the whole file, so keep it off the event loop
+        preflight = await asyncio.to_thread(self._preflight, file_path)
+        if not preflight.get("success", True):
+            return preflight
+
+        mime_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
         try:
             with open(file_path, "rb") as f:
-                files = {"file": (os.path.basename(file_path), f)}
-                response = requests.post(
-                    f"{self.base_url}{endpoint}",
+                files = {field: (os.path.basename(file_path), f, mime_type)}
+                response = await self._client.post(
+                    endpoint,
                     files=files,
-                    timeout=300,
+                    data=data,
+                    headers={"X-Content-SHA256": preflight["sha256"]},
+                    timeout=timeout,
                 )
                 return {
                     "success": True,
                     "status_code": response.status_code,
-                    "data": response.json(),
+                    "data": orjson.loads(response.content),
                 }
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
+            # ValueError covers non-JSON replies, e.g. an HTML error page
             return {"success": False, "error": str(e)}
 
-    def parse_image(self, file_path: str) -> Dict[str, Any]:
+    async def parse_image(self, file_path: str) -> Dict[str, Any]:
         """Parse an image file (JPEG, PNG, BMP, TIFF, HEIC).
 
         Args:
@@ -116,26 +192,9 @@ class OmniParseAPIClient:
         Returns:
             Response from the API containing parsed text and metadata
         """
-        if not os.path.exists(file_path):
-            return {"success": False, "error": f"File not found: {file_path}"}
-
-        try:
-            with open(file_path, "rb") as f:
-                files = {"file": (os.path.basename(file_path), f)}
-                response = requests.post(
-                    f"{self.base_url}/parse_image/image",
-                    files=files,
-                    timeout=300,
-                )
-                return {
-                    "success": True,
-                    "status_code": response.status_code,
-                    "data": response.json(),
-                }
-        except requests.exceptions.RequestException as e:
-            return {"success": False, "error": str(e)}
+        return await self._parse_file_endpoint("/parse_image/image", file_path)
 
-    def process_image(
+    async def process_image(
         self, file_path: str, task: str = "Caption"
     ) -> Dict[str, Any]:
         """Process an image with a specific task.
@@ -147,28 +206,14 @@ class OmniParseAPIClient:
         Returns:
             Response from the API containing processed results
         """
-        if not os.path.exists(file_path):
-            return {"success": False, "error": f"File not found: {file_path}"}
-
-        try:
-            with open(file_path, "rb") as f:
-                files = {"image": (os.path.basename(file_path), f)}
-                data = {"task": task}
-                response = requests.post(
-                    f"{self.base_url}/parse_image/process_image",
-                    files=files,
-                    data=data,
-                    timeout=300,
-                )
-                return {
-                    "success": True,
-                    "status_code": response.status_code,
-                    "data": response.json(),
-                }
-        except requests.exceptions.RequestException as e:
-            return {"success": False, "error": str(e)}
-
-    def parse_media_audio(self, file_path: str) -> Dict[str, Any]:
+        return await self._parse_file_endpoint(
+            "/parse_image/process_image",
+            file_path,
+            field="image",
+            data={"task": task},
+        )
+
+    async def parse_media_audio(self, file_path: str) -> Dict[str, Any]:
         """Parse an audio file (MP3, WAV, AAC).
 
         Args:
@@ -177,26 +222,11 @@ class OmniParseAPIClient:
         Returns:
             Response from the API containing transcribed text
         """
-        if not os.path.exists(file_path):
-            return {"success": False, "error": f"File not found: {file_path}"}
-
-        try:
-            with open(file_path, "rb") as f:
-                files = {"file": (os.path.basename(file_path), f)}
-                response = requests.post(
-                    f"{self.base_url}/parse_media/audio",
-                    files=files,
-                    timeout=600,
-                )
-                return {
-                    "success": True,
-                    "status_code": response.status_code,
-                    "data": response.json(),
-                }
-        except requests.exceptions.RequestException as e:
-            return {"success": False, "error": str(e)}
+        return await self._parse_file_endpoint(
+            "/parse_media/audio", file_path, timeout=600
+        )
 
-    def parse_media_video(self, file_path: str) -> Dict[str, Any]:
+    async def parse_media_video(self, file_path: str) -> Dict[str, Any]:
         """Parse a video file (MP4, MKV, AVI, MOV).
 
         Args:
@@ -205,49 +235,67 @@ class OmniParseAPIClient:
         Returns:
             Response from the API containing transcribed text
         """
-        if not os.path.exists(file_path):
-            return {"success": False, "error": f"File not found: {file_path}"}
-
-        try:
-            with open(file_path, "rb") as f:
-                files = {"file": (os.path.basename(file_path), f)}
-                response = requests.post(
-                    f"{self.base_url}/parse_media/video",
-                    files=files,
-                    timeout=600,
-                )
-                return {
-                    "success": True,
-                    "status_code": response.status_code,
-                    "data": response.json(),
-                }
-        except requests.exceptions.RequestException as e:
-            return {"success": False, "error": str(e)}
+        return await self._parse_file_endpoint(
+            "/parse_media/video", file_path, timeout=600
+        )
 
-    def parse_website(self, url: str) -> Dict[str, Any]:
+    async def parse_website(self, url: str, refresh: bool = False) -> Dict[str, Any]:
         """Parse a web page.
 
+        Successful parses are kept in an LRU cache keyed by URL, so repeated
+        calls return without hitting the server. With ``refresh=True`` the
+        cached entry is revalidated using the ETag / Last-Modified headers the
+        server sent, and a 304 reply reuses the cached result.
+
         Args:
             url: The URL of the web page to parse
+            refresh: Revalidate a cached result with the server
 
         Returns:
             Response from the API containing parsed content
         """
+        cached = self._website_cache.get(url)
+        if cached is not None and not refresh:
+            self._website_cache.move_to_end(url)
+            return cached["result"]
+
+        headers = {"accept": "application/json"}
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
         try:
-            response = requests.post(
-                f"{self.base_url}/parse_website/parse",
+            response = await self._client.post(
+                "/parse_website/parse",
                 params={"url": url},
-                headers={"accept": "application/json"},
+                headers=headers,
                 timeout=60,
             )
-            return {
+            if response.status_code == 304 and cached is not None:
+                self._website_cache.move_to_end(url)
+                return cached["result"]
+            result = {
                 "success": True,
                 "status_code": response.status_code,
-                "data": response.json(),
+                "data": orjson.loads(response.content),
             }
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
+            # ValueError covers non-JSON replies, e.g. an HTML error page
             return {"success": False, "error": str(e)}
 
+        if response.status_code == 200:
+            self._website_cache[url] = {
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+                "result": result,
+            }
+            self._website_cache.move_to_end(url)
+            if len(self._website_cache) > WEBSITE_CACHE_SIZE:
+                self._website_cache.popitem(last=False)
+        return result
+
     def print_response(self, response: Dict[str, Any], max_text_length: int = 500):
         """Pretty print an API response."""
         if not response.get("success"):
@@ -268,7 +316,7 @@ class OmniParseAPIClient:
         # Print metadata if present
         if "metadata" in data:
             print(f"\n[METADATA]")
-            print(json.dumps(data["metadata"], indent=2))
+            print(orjson.dumps(data["metadata"], option=orjson.OPT_INDENT_2).decode())
 
         # Print images info if present
         if "images" in data:
@@ -278,7 +326,7 @@ class OmniParseAPIClient:
 
         # Print full JSON if requested
         print(f"\n[FULL JSON]")
-        print(json.dumps(data, indent=2))
+        print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
 
 
 def create_sample_files(output_dir: str) -> Dict[str, str]:
@@ -319,15 +367,31 @@ def create_sample_files(output_dir: str) -> Dict[str, str]:
     return sample_files
 
 
-def run_tests(client: OmniParseAPIClient, test_type: str = "all") -> Dict[str, bool]:
+async def offline_website_response(url: str) -> Dict[str, Any]:
+    """Canned /parse_website/parse reply used when the network is off limits."""
+    return {
+        "success": True,
+        "status_code": 200,
+        "data": {
+            "text": "Example Domain",
+            "metadata": {"url": url, "offline": True},
+        },
+    }
+
+
+async def run_tests(
+    client: OmniParseAPIClient, test_type: str = "all", live_network: bool = False
+) -> Dict[str, Optional[bool]]:
     """Run API tests based on the specified type.
 
     Args:
         client: OmniParseAPIClient instance
         test_type: Type of tests to run ("all", "health", "document", "image", "media", "website")
+        live_network: Let the website test make the server fetch a real URL
+            instead of using a canned response
 
     Returns:
-        Dictionary of test results
+        Dictionary of test results; None marks a test that was skipped
     """
     results = {}
 
@@ -338,14 +402,24 @@ def run_tests(client: OmniParseAPIClient, test_type: str = "all") -> Dict[str, b
     print(f"Test Type: {test_type}")
     print("=" * 60)
 
+    # The HTTP tests are independent, so fire them concurrently up front and
+    # print their results in order below
+    test_url = "https://example.com"
+    requests = {"health": client.test_health()}
+    if test_type in ("all", "website"):
+        if live_network:
+            requests["parse_website"] = client.parse_website(test_url)
+        else:
+            requests["parse_website"] = offline_website_response(test_url)
+    responses = dict(zip(requests, await asyncio.gather(*requests.values())))
+
     # Test 1: Health check (always run)
     print("\n[TEST 1] Health Check")
-    result = client.test_health()
+    result = responses["health"]
     results["health"] = result.get("success", False)
     client.print_response(result)
-    time.sleep(1)
 
-    if test_type in ("all", "health"):
+    if test_type == "health":
         return results
 
     # Test 2: Document parsing
@@ -360,135 +434,149 @@ def run_tests(client: OmniParseAPIClient, test_type: str = "all") -> Dict[str, b
             print("[INFO] Note: For real testing, convert this to PDF/DOC format")
 
             # Example: Parse document from file
-            # result = client.parse_document("/path/to/real/document.pdf")
+            # result = await client.parse_document("/path/to/real/document.pdf")
             # results["parse_document"] = result.get("success", False)
             # client.print_response(result)
         results["parse_document"] = False  # Placeholder
-        time.sleep(1)
 
     # Test 3: Image parsing
     if test_type in ("all", "image"):
         print("\n[TEST 3] Image Parsing")
         print("[INFO] Image parsing tests require actual image files")
-        print("[INFO] Example command: client.parse_image('/path/to/image.jpg')")
+        print("[INFO] Example command: await client.parse_image('/path/to/image.jpg')")
         results["parse_image"] = False  # Placeholder
-        time.sleep(1)
 
     # Test 4: Media parsing
     if test_type in ("all", "media"):
         print("\n[TEST 4] Media Parsing")
         print("[INFO] Media parsing tests require actual audio/video files")
-        print("[INFO] Example command: client.parse_media_audio('/path/to/audio.mp3')")
+        print("[INFO] Example command: await client.parse_media_audio('/path/to/audio.mp3')")
         results["parse_media"] = False  # Placeholder
-        time.sleep(1)
 
     # Test 5: Website parsing
     if test_type in ("all", "website"):
         print("\n[TEST 5] Website Parsing")
         # Example: Parse a website
-        # result = client.parse_website("https://example.com")
+        # result = await client.parse_website("https://example.com")
         # results["parse_website"] = result.get("success", False)
         # client.print_response(result)
 
-        # Test with a real URL (commented out for safety)
-        test_url = "https://example.com"
+        # Only hits the real URL with --live-network, so CI stays offline
         print(f"[INFO] Testing with URL: {test_url}")
-        result = client.parse_website(test_url)
-        results["parse_website"] = result.get("success", False)
+        if not live_network:
+            print("[INFO] Using a canned response (pass --live-network to fetch it)")
+        result = responses["parse_website"]
         client.print_response(result)
+        if live_network:
+            results["parse_website"] = result.get("success", False)
+        else:
+            # The canned reply never reached the server, so it proves nothing
+            results["parse_website"] = None
 
     print("\n" + "=" * 60)
     print("Test Summary")
     print("=" * 60)
     for test_name, passed in results.items():
-        status = "[PASS]" if passed else "[FAIL]"
+        if passed is None:
+            status = "[SKIP]"
+        else:
+            status = "[PASS]" if passed else "[FAIL]"
         print(f"  {status} {test_name}")
     print("=" * 60)
 
     return results
 
 
-def main():
-    """Main entry point."""
-    parser = argparse.ArgumentParser(
-        description="OmniParse API Testing Script"
-    )
-    parser.add_argument(
-        "--host",
-        default="localhost",
-        help="API host (default: localhost)",
-    )
-    parser.add_argument(
-        "--port",
-        type=int,
-        default=8000,
-        help="API port (default: 8000)",
-    )
-    parser.add_argument(
-        "--test",
-        choices=["all", "health", "document", "image", "media", "website"],
-        default="all",
-        help="Type of tests to run (default: all)",
-    )
-    parser.add_argument(
-        "--file",
-        help="Path to file for document/image parsing",
-    )
-    parser.add_argument(
-        "--url",
-        help="URL for website parsing",
-    )
-    parser.add_argument(
-        "--task",
-        default="Caption",
-        help="Task for image processing (default: Caption)",
-    )
-    parser.add_argument(
-        "--output",
-        choices=["summary", "json"],
-        default="summary",
-        help="Output format (default: summary)",
-    )
-
-    args = parser.parse_args()
-
-    # Create client
-    client = OmniParseAPIClient(host=args.host, port=args.port)
-
-    # If file or URL provided, run specific test
-    if args.file:
-        # Determine file type by extension
-        ext = os.path.splitext(args.file)[1].lower()
-        if ext in (".pdf", ".ppt", ".doc", ".pptx", ".docx"):
-            result = client.parse_document(args.file)
-        elif ext in (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff"):
-            result = client.process_image(args.file, args.task)
-        elif ext in (".mp3", ".wav", ".aac"):
-            result = client.parse_media_audio(args.file)
-        elif ext in (".mp4", ".mkv", ".avi", ".mov"):
-            result = client.parse_media_video(args.file)
-        else:
-            print(f"Unsupported file type: {ext}")
-            sys.exit(1)
-
-        if args.output == "json":
-            print(json.dumps(result, indent=2))
-        else:
-            client.print_response(result)
+async def run_cli(args: argparse.Namespace):
+    """Run the requested parse or test suite on a single event loop."""
+    async with OmniParseAPIClient(host=args.host, port=args.port) as client:
+        # If file or URL provided, run specific test
+        if args.file:
+            # Determine file type by extension
+            ext = os.path.splitext(args.file)[1].lower()
+            if ext in (".pdf", ".ppt", ".doc", ".pptx", ".docx"):
+                result = await client.parse_document(args.file)
+            elif ext in (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff"):
+                result = await client.process_image(args.file, args.task)
+            elif ext in (".mp3", ".wav", ".aac"):
+                result = await client.parse_media_audio(args.file)
+            elif ext in (".mp4", ".mkv", ".avi", ".mov"):
+                result = await client.parse_media_video(args.file)
+            else:
+                print(f"Unsupported file type: {ext}")
+                sys.exit(1)
+
+            if args.output == "json":
+                print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
+            else:
+                client.print_response(result)
+
+        elif args.url:
+            result = await client.parse_website(args.url)
+            if args.output == "json":
+                print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
+            else:
+                client.print_response(result)
 
-    elif args.url:
-        result = client.parse_website(args.url)
-        if args.output == "json":
-            print(json.dumps(result, indent=2))
         else:
-            client.print_response(result)
+            # Run full test suite
+            results = await run_tests(client, args.test, args.live_network)
+
+            if args.output == "json":
+                print(orjson.dumps(results, option=orjson.OPT_INDENT_2).decode())
+
+
+# Built once at import so long-running drivers can reuse it
+parser = argparse.ArgumentParser(
+    description="OmniParse API Testing Script"
+)
+parser.add_argument(
+    "--host",
+    default="localhost",
+    help="API host (default: localhost)",
+)
+parser.add_argument(
+    "--port",
+    type=int,
+    default=8000,
+    help="API port (default: 8000)",
+)
+parser.add_argument(
+    "--test",
+    choices=["all", "health", "document", "image", "media", "website"],
+    default="all",
+    help="Type of tests to run (default: all)",
+)
+parser.add_argument(
+    "--file",
+    help="Path to file for document/image parsing",
+)
+parser.add_argument(
+    "--url",
+    help="URL for website parsing",
+)
+parser.add_argument(
+    "--task",
+    default="Caption",
+    help="Task for image processing (default: Caption)",
+)
+parser.add_argument(
+    "--live-network",
+    action="store_true",
+    help="Let the website test fetch a real URL (default: use a canned response)",
+)
+parser.add_argument(
+    "--output",
+    choices=["summary", "json"],
+    default="summary",
+    help="Output format (default: summary)",
+)
 
-    else:
-        # Run full test suite
-        results = run_tests(client, args.test)
 
-        if args.output == "json":
-            print(json.dumps(results, indent=2))
+def main():
+    """Main entry point."""
+    args = parser.parse_args()
+    asyncio.run(run_cli(args))
 
 
 if __name__ == "__main__":